@@ -5,23 +5,41 @@ Top 5 Gainers/Losers from Global and Indian Markets + News + Form Submission
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-import yfscreen as yfs
-import yfinance as yf
+from fastapi.responses import ORJSONResponse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict
+import html
 import logging
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import gspread
+import orjson
 import os
+import threading
+import time
+
+# yfinance, yfscreen, pandas, httpx, aiosmtplib, email.mime and gspread_asyncio are
+# imported inside the functions that use them, so serverless cold starts (and
+# /health, /) don't pay for them until a request actually needs them
+if TYPE_CHECKING:
+    from email.mime.multipart import MIMEMultipart
+
+    import aiosmtplib
+
+# Use uvloop when available (uvicorn[standard]) - serverless runtimes that import
+# the app directly never go through uvicorn.run, so install the policy here too
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# FastAPI app
-app = FastAPI(title="Market Overview API")
+# FastAPI app - orjson serializes the (fairly large) market-summary payload much faster than stdlib json
+app = FastAPI(title="Market Overview API", default_response_class=ORJSONResponse)
 
 # Allow CORS for all origins
 app.add_middleware(
@@ -48,45 +66,193 @@ EMAIL_CONFIG_AKASH = {
 }
 
 GOOGLE_SHEET_ID = "1tGgnMQWpX19Us7H0c_Sx8s9SkmeTZCs8fekQIl3qJL4"
+GOOGLE_SERVICE_ACCOUNT_PATH = "GOOGLE_SERVICE_ACCOUNT_JSON"
+GOOGLE_SHEETS_SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+# Checked once at startup - without credentials the sheet write is skipped entirely
+GOOGLE_SHEETS_CONFIGURED = os.path.exists(GOOGLE_SERVICE_ACCOUNT_PATH)
+
+# Market data only moves at ~minute granularity, so summaries are reused for this long
+MARKET_SUMMARY_CACHE_TTL = 45  # seconds
+
+# Optional Redis cache shared by all workers for the individual upstream fetches. It sits
+# behind the in-process summary cache, so data can be up to
+# MARKET_SUMMARY_CACHE_TTL + FETCH_CACHE_TTL (60s) old when served
+REDIS_URL = os.getenv("REDIS_URL")
+FETCH_CACHE_TTL = 15  # seconds
+
+# Yahoo screener endpoints (the same ones yfscreen.get_data talks to)
+YAHOO_CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+YAHOO_SCREENER_URL = "https://query1.finance.yahoo.com/v1/finance/screener"
+YAHOO_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
+
+# Shared keep-alive client so screener calls reuse pooled connections, cookies and TLS sessions.
+# Its pool is bound to the event loop it was created on, so it is tracked together with that loop
+_http_client = None
+_http_client_loop = None
+_yahoo_crumb = None
+
+
+def get_http_client():
+    """Return the shared HTTP client for the running event loop, creating it on first use"""
+    global _http_client, _http_client_loop, _yahoo_crumb
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client_loop is not loop:
+        import httpx
+
+        # A client from a previous (usually closed) loop can't be reused, and the crumb
+        # belongs to that client's cookies, so both are replaced
+        _http_client = httpx.AsyncClient(
+            timeout=10,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=50),
+            headers={"User-Agent": YAHOO_USER_AGENT},
+        )
+        _http_client_loop = loop
+        _yahoo_crumb = None
+    return _http_client
 
 
-def fetch_top_stocks(region_filter=None, gainers=True):
-    """Fetch top 5 gainers or losers"""
-    try:
-        filters = []
-        if gainers:
-            filters.append(["gt", ["percentchange", 3]])
-        else:
-            filters.append(["lt", ["percentchange", -2.5]])
-
-        market_cap_threshold = 2e9 if region_filter is None else 1e9
-        price_threshold = 5 if region_filter is None else 10
-
-        filters.append(["gt", ["intradaymarketcap", market_cap_threshold]])
-        filters.append(["gt", ["intradayprice", price_threshold]])
-        filters.append(["gt", ["dayvolume", 1000]])
+# One session and one long-lived thread pool for all yfinance calls. curl_cffi keeps a
+# connection per thread, so reusing threads is what lets Yahoo connections stay warm
+_yf_session = None
+_yf_session_lock = threading.Lock()
+YAHOO_EXECUTOR = ThreadPoolExecutor(max_workers=24, thread_name_prefix="yahoo")
 
-        if region_filter:
-            filters.append(["eq", ["region", region_filter]])
 
-        query = yfs.create_query(filters)
-        payload = yfs.create_payload("equity", query)
-        data = yfs.get_data(payload)
+def get_yf_session():
+    """Return the session shared by every yfinance Ticker, creating it on first use"""
+    global _yf_session
+    with _yf_session_lock:
+        if _yf_session is None:
+            try:
+                # Recent yfinance expects a browser-impersonating curl_cffi session
+                from curl_cffi import requests as curl_requests
+
+                _yf_session = curl_requests.Session(impersonate="chrome")
+            except ImportError:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                _yf_session = requests.Session()
+                _yf_session.headers.update({"User-Agent": YAHOO_USER_AGENT})
+                adapter = HTTPAdapter(
+                    pool_connections=50,
+                    pool_maxsize=50,
+                    max_retries=Retry(total=2, backoff_factor=0.2),
+                )
+                _yf_session.mount("https://", adapter)
+        return _yf_session
+
+
+async def _get_yahoo_crumb(refresh=False):
+    """Return the cached Yahoo crumb, fetching a new one on first use or when refresh is set"""
+    global _yahoo_crumb
+    # Resolve the client first - switching to a new loop's client clears the crumb
+    client = get_http_client()
+    if _yahoo_crumb is None or refresh:
+        response = await client.get(YAHOO_CRUMB_URL)
+        response.raise_for_status()
+        _yahoo_crumb = response.text.strip()
+    return _yahoo_crumb
+
+
+async def _yfs_get_data(payload):
+    """Async equivalent of yfs.get_data for a single page of screener results"""
+    import pandas as pd
+    import yfscreen as yfs
+
+    params = {
+        "crumb": await _get_yahoo_crumb(),
+        "lang": "en-US",
+        "region": "US",
+        "formatted": "true",
+        "corsDomain": "finance.yahoo.com",
+    }
+    response = await get_http_client().post(YAHOO_SCREENER_URL, params=params, json=payload)
+    if response.status_code in (401, 403):
+        # Crumb expired - fetch a fresh one and retry once
+        params["crumb"] = await _get_yahoo_crumb(refresh=True)
+        response = await get_http_client().post(YAHOO_SCREENER_URL, params=params, json=payload)
+    response.raise_for_status()
+
+    quotes = response.json()["finance"]["result"][0]["quotes"]
+    if not quotes:
+        return pd.DataFrame()
+    return yfs.process_cols(pd.json_normalize(quotes))
+
+
+# Percent-change thresholds a stock must cross to count as a gainer / loser
+GAINER_THRESHOLD = 3
+LOSER_THRESHOLD = -2.5
+TOP_STOCK_COLUMNS = ["symbol", "regularMarketPrice.raw", "regularMarketChangePercent.raw", "regularMarketVolume.raw"]
+
+
+@lru_cache(maxsize=None)
+def _screener_payload(region_filter=None, gainers=True):
+    """Build the top-5 gainers or losers screener payload for a region (cached - callers must not mutate it)"""
+    import yfscreen as yfs
+
+    filters = []
+    if gainers:
+        filters.append(["gt", ["percentchange", GAINER_THRESHOLD]])
+    else:
+        filters.append(["lt", ["percentchange", LOSER_THRESHOLD]])
+
+    market_cap_threshold = 2e9 if region_filter is None else 1e9
+    price_threshold = 5 if region_filter is None else 10
+
+    filters.append(["gt", ["intradaymarketcap", market_cap_threshold]])
+    filters.append(["gt", ["intradayprice", price_threshold]])
+    filters.append(["gt", ["dayvolume", 1000]])
+
+    if region_filter:
+        filters.append(["eq", ["region", region_filter]])
+
+    # Let the screener rank by percent change so the 5-row page is exactly the top 5
+    query = yfs.create_query(filters)
+    return yfs.create_payload(
+        "equity",
+        query,
+        size=5,
+        sort_field="percentchange",
+        sort_type="desc" if gainers else "asc",
+    )
+
+
+async def fetch_top_stocks(region_filter=None, gainers=True):
+    """Fetch top 5 gainers or losers"""
+    try:
+        data = await _yfs_get_data(_screener_payload(region_filter, gainers))
         data_sorted = data.sort_values("regularMarketChangePercent.raw", ascending=not gainers)
 
-        return data_sorted.head(5)[["symbol", "regularMarketPrice.raw", "regularMarketChangePercent.raw", "regularMarketVolume.raw"]].to_dict(orient="records")
+        return data_sorted.head(5)[TOP_STOCK_COLUMNS].to_dict(orient="records")
 
     except Exception as e:
-        logger.error(f"Error fetching stocks: {e}")
+        logger.error("Error fetching stocks: %s", e)
         return []
 
 
+async def fetch_top_movers(region_filter=None):
+    """Fetch top 5 gainers and top 5 losers for a region, returned as (gainers, losers)"""
+    gainers, losers = await asyncio.gather(
+        fetch_top_stocks(region_filter, gainers=True),
+        fetch_top_stocks(region_filter, gainers=False),
+    )
+    return gainers, losers
+
+
 def fetch_global_news():
+    import yfinance as yf
+
     try:
-        ticker = yf.Ticker("^GSPC")  # Use a global market index ticker
+        ticker = yf.Ticker("^GSPC", session=get_yf_session())  # Use a global market index ticker
         news = ticker.news
 
-        logger.info(f"Global news API returned {len(news) if news else 0} articles")
+        logger.info("Global news API returned %s articles", len(news) if news else 0)
 
         global_news = []
         for article in news:
@@ -96,10 +262,10 @@ def fetch_global_news():
             link = content.get("canonicalUrl", {}).get("url", "No link")
             global_news.append({"title": title, "publisher": publisher, "link": link})
 
-        logger.info(f"Processed {len(global_news)} global news articles")
+        logger.info("Processed %s global news articles", len(global_news))
         return global_news[:5]  # Return top 5
     except Exception as e:
-        logger.error(f"Error fetching global news: {e}")
+        logger.error("Error fetching global news: %s", e)
         return []  # Return empty if nothing
 
 
@@ -111,6 +277,21 @@ INDIAN_INDICES = {
     "midcap_nifty": "^NSEMDCP50"  # Use caret-prefixed index symbol and fallback to history()
 }
 
+# Symbol and display name per index, built once at import instead of on every request
+INDIAN_INDICES_META = {
+    index_name: {"symbol": symbol, "name": index_name.replace("_", " ").title()}
+    for index_name, symbol in INDIAN_INDICES.items()
+}
+
+# Numeric fields of an index entry when no data could be fetched
+EMPTY_INDEX_FIELDS = {
+    "current_price": None,
+    "previous_close": None,
+    "change": None,
+    "change_percent": None,
+    "volume": None,
+}
+
 
 indian_symbols = [
     "RELIANCE.NS",
@@ -143,7 +324,9 @@ def get_index_data(symbol: str, name: str) -> Dict:
     - Fallback to ticker.history() when fast_info / live data not available (Midcap)
     - Return standardized dict with status
     """
-    ticker = yf.Ticker(symbol)
+    import yfinance as yf
+
+    ticker = yf.Ticker(symbol, session=get_yf_session())
     current_price = None
     previous_close = None
     volume = None
@@ -177,32 +360,22 @@ def get_index_data(symbol: str, name: str) -> Dict:
         if current_price is None:
             hist = ticker.history(period="2d")
             if hist is not None and not hist.empty:
+                # Work on the raw NumPy arrays rather than per-element pandas .iloc lookups
+                closes = hist["Close"].to_numpy(dtype=float)
+                current_price = float(closes[-1])
                 # If only one row exists, use it as current and previous_close == current
-                if len(hist) >= 2:
-                    previous_close = float(hist["Close"].iloc[-2])
-                else:
-                    previous_close = float(hist["Close"].iloc[-1])
-                current_price = float(hist["Close"].iloc[-1])
+                previous_close = float(closes[-2]) if len(closes) >= 2 else current_price
                 # volume may or may not be present
                 if "Volume" in hist.columns and not hist["Volume"].empty:
                     try:
-                        volume = int(hist["Volume"].iloc[-1])
+                        volume = int(hist["Volume"].to_numpy()[-1])
                     except Exception:
                         volume = None
                 status = "history_data"
 
     except Exception as e:
-        logger.exception(f"Error fetching index {name} ({symbol}): {e}")
-        return {
-            "symbol": symbol,
-            "name": name,
-            "current_price": None,
-            "previous_close": None,
-            "change": None,
-            "change_percent": None,
-            "volume": None,
-            "status": "error"
-        }
+        logger.exception("Error fetching index %s (%s): %s", name, symbol, e)
+        return {"symbol": symbol, "name": name, **EMPTY_INDEX_FIELDS, "status": "error"}
 
     # Calculate change & percent safely
     change = None
@@ -235,43 +408,65 @@ def get_index_data(symbol: str, name: str) -> Dict:
     }
 
 
+def _fetch_one_index(index_name):
+    """Fetch a single Indian index, returning an error entry instead of raising"""
+    meta = INDIAN_INDICES_META[index_name]
+    try:
+        # Use the robust helper
+        index_data = get_index_data(meta["symbol"], meta["name"])
+        logger.info("Fetched data for %s: status=%s", index_name, index_data.get('status'))
+        return index_data
+    except Exception as e:
+        logger.exception("Error fetching data for %s (%s): %s", index_name, meta["symbol"], e)
+        return {**meta, **EMPTY_INDEX_FIELDS, "status": "error"}
+
+
 def fetch_indian_indices():
     """Fetch current data for Indian market indices - uses get_index_data fallback logic"""
     try:
         indices_data = {}
-        for index_name, symbol in INDIAN_INDICES.items():
-            try:
-                # Use the robust helper
-                indices_data[index_name] = get_index_data(symbol, index_name.replace("_", " ").title())
-                logger.info(f"Fetched data for {index_name}: status={indices_data[index_name].get('status')}")
-            except Exception as e:
-                logger.exception(f"Error fetching data for {index_name} ({symbol}): {e}")
-                indices_data[index_name] = {
-                    "symbol": symbol,
-                    "name": index_name.replace("_", " ").title(),
-                    "current_price": None,
-                    "previous_close": None,
-                    "change": None,
-                    "change_percent": None,
-                    "volume": None,
-                    "status": "error"
-                }
+        # Indices are independent network calls, so fetch them all at once
+        futures = {
+            YAHOO_EXECUTOR.submit(_fetch_one_index, index_name): index_name
+            for index_name in INDIAN_INDICES_META
+        }
+        for future in as_completed(futures):
+            indices_data[futures[future]] = future.result()
         return indices_data
     except Exception as e:
-        logger.error(f"Error fetching Indian indices: {e}")
+        logger.error("Error fetching Indian indices: %s", e)
         return {}
 
 
+def _fetch_symbol_news(ticker):
+    """Fetch the top news article for a single ticker"""
+    return ticker.get_news(count=1)[:1]  # only request the top 1 news per symbol
+
+
 def fetch_indian_news(symbols):
+    import yfinance as yf
+
     try:
         news_results = []
         seen_links = set()
         successful_symbols = 0
 
-        for symbol in symbols:
+        if not symbols:
+            return news_results
+
+        # One Tickers batch shares a single session and cookie/crumb bootstrap across symbols
+        tickers = yf.Tickers(" ".join(symbols), session=get_yf_session())
+
+        # Each news call is a blocking HTTP round-trip, so fan out across threads
+        futures = [
+            (symbol, YAHOO_EXECUTOR.submit(_fetch_symbol_news, ticker))
+            for symbol, ticker in tickers.tickers.items()
+        ]
+
+        # Collect in submission order so the dedupe and output order stay stable
+        for symbol, future in futures:
             try:
-                ticker = yf.Ticker(symbol)
-                news_articles = ticker.news[:1]  # top 1 news per symbol
+                news_articles = future.result()
 
                 if news_articles:
                     successful_symbols += 1
@@ -291,39 +486,27 @@ def fetch_indian_news(symbols):
                         })
                         seen_links.add(link)
             except Exception as e:
-                logger.debug(f"Failed to get news for {symbol}: {e}")
+                logger.debug("Failed to get news for %s: %s", symbol, e)
                 continue  # Skip this symbol if it fails
 
-        logger.info(f"Indian news: {successful_symbols} symbols had news, {len(news_results)} unique articles")
+        logger.info("Indian news: %s symbols had news, %s unique articles", successful_symbols, len(news_results))
         return news_results
     except Exception as e:
-        logger.error(f"Error fetching Indian news: {e}")
+        logger.error("Error fetching Indian news: %s", e)
         return []  # Return empty if nothing
 
 
-async def send_email(subject: str, form_data: dict):
-    """Send email with form data"""
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = "Aadhaarcapital25@gmail.com"
-        msg['To'] = "support@aadhaarcapital.com"  
-        msg['Subject'] = subject
-
-        # Create HTML table for form data
-        table_rows = ""
-        for key, value in form_data.items():
-            # Format key to be more readable (capitalize and replace underscores)
-            formatted_key = key.replace("_", " ").title()
-            table_rows += f"""
+# Enquiry email layout, rendered once per submission by render_email_html
+EMAIL_ROW_FMT = """
             <tr>
-                <td style="padding: 8px; border: 1px solid #ddd; background-color: #f9f9f9; font-weight: bold;">{formatted_key}</td>
+                <td style="padding: 8px; border: 1px solid #ddd; background-color: #f9f9f9; font-weight: bold;">{key}</td>
                 <td style="padding: 8px; border: 1px solid #ddd;">{value}</td>
             </tr>"""
 
-        html_body = f"""
+EMAIL_TEMPLATE = """
         <html>
         <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <h2 style="color: #2c3e50;">Hello Aadhar Capital Team,</h2>
+            <h2 style="color: #2c3e50;">{greeting}</h2>
 
             <p>You have received a new enquiry from your website.</p>
 
@@ -337,12 +520,12 @@ async def send_email(subject: str, form_data: dict):
                     </tr>
                 </thead>
                 <tbody>
-                    {table_rows}
+                    {rows}
                 </tbody>
             </table>
 
             <p style="margin-top: 30px; padding: 15px; background-color: #ecf0f1; border-left: 4px solid #3498db;">
-                <strong>Submitted at:</strong> {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+                <strong>Submitted at:</strong> {submitted_at}
             </p>
 
             <hr style="margin: 30px 0; border: none; border-top: 1px solid #bdc3c7;">
@@ -354,142 +537,201 @@ async def send_email(subject: str, form_data: dict):
         </html>
         """
 
-        msg.attach(MIMEText(html_body, 'html'))
 
-        server = smtplib.SMTP(EMAIL_CONFIG["smtp_server"], EMAIL_CONFIG["smtp_port"])
-        server.starttls()
+def render_email_html(greeting: str, form_data: dict) -> str:
+    """Render the enquiry email body, escaping user-submitted keys and values"""
+    # Format keys to be more readable (capitalize and replace underscores)
+    rows = "".join(
+        EMAIL_ROW_FMT.format(
+            key=html.escape(key.replace("_", " ").title()),
+            value=html.escape(str(value)),
+        )
+        for key, value in form_data.items()
+    )
+    return EMAIL_TEMPLATE.format(
+        greeting=greeting,
+        rows=rows,
+        submitted_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+# Persistent, authenticated SMTP connections keyed by sender account
+_smtp_clients: Dict[str, "aiosmtplib.SMTP"] = {}
+_smtp_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def _connect_smtp(config: dict) -> "aiosmtplib.SMTP":
+    """Open and authenticate a new SMTP connection for the given account"""
+    import aiosmtplib
+
+    client = aiosmtplib.SMTP(hostname=config["smtp_server"], port=config["smtp_port"], start_tls=True)
+    await client.connect()
+    await client.login(config["email"], config["password"])
+    return client
+
+
+def _drop_smtp_client(account: str):
+    """Forget the cached SMTP connection for account, closing it if still possible"""
+    client = _smtp_clients.pop(account, None)
+    if client is not None:
+        try:
+            client.close()
+        except Exception:
+            # The transport may belong to an event loop that has already been closed
+            pass
+
+
+async def send_smtp_message(config: dict, msg: "MIMEMultipart"):
+    """Send msg over a reused SMTP connection, reconnecting only when it has gone stale"""
+    import aiosmtplib
+
+    account = config["email"]
+    lock = _smtp_locks.setdefault(account, asyncio.Lock())
+
+    async with lock:
+        client = _smtp_clients.get(account)
+        if client is not None:
+            try:
+                # Gmail drops idle sessions and the client may be tied to an event loop
+                # that no longer runs, so check the connection is still usable
+                if not client.is_connected:
+                    raise ConnectionError("SMTP connection closed")
+                await client.noop()
+            except Exception as e:
+                logger.info("Reconnecting SMTP for %s: %s", account, e)
+                _drop_smtp_client(account)
+                client = None
+
+        if client is None:
+            client = await _connect_smtp(config)
+            _smtp_clients[account] = client
+
+        try:
+            await client.send_message(msg)
+        except (aiosmtplib.SMTPServerDisconnected, ConnectionError) as e:
+            # The connection died under us - retry once on a fresh one
+            logger.warning("SMTP connection lost for %s, retrying on a new connection: %s", account, e)
+            _drop_smtp_client(account)
+            client = await _connect_smtp(config)
+            _smtp_clients[account] = client
+            await client.send_message(msg)
+        except Exception:
+            # Rejections (refused recipients, DATA errors, ...) are permanent and a failure after
+            # DATA was accepted would duplicate the email, so don't retry - just don't keep the client
+            _drop_smtp_client(account)
+            raise
+
+
+async def send_email(subject: str, form_data: dict):
+    """Send email with form data"""
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
+    try:
+        msg = MIMEMultipart()
+        msg['From'] = "Aadhaarcapital25@gmail.com"
+        msg['To'] = "support@aadhaarcapital.com"  
+        msg['Subject'] = subject
+
+        html_body = render_email_html("Hello Aadhar Capital Team,", form_data)
+
+        msg.attach(MIMEText(html_body, 'html'))
 
         if EMAIL_CONFIG["password"]:
-            server.login(EMAIL_CONFIG["email"], EMAIL_CONFIG["password"])
-            server.send_message(msg)
-            server.quit()
+            await send_smtp_message(EMAIL_CONFIG, msg)
             return True
         else:
             logger.warning("Email password not configured")
             return False
 
     except Exception as e:
-        logger.error(f"Error sending email: {e}")
+        logger.error("Error sending email: %s", e)
         return False
 
 
 async def send_email_akash(subject: str, form_data: dict):
     """Send email with form data"""
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
     try:
         msg = MIMEMultipart()
         msg['From'] = "akash.yadavv181198@gmail.com"
         msg['To'] = "akashyadav181198@gmail.com"  
         msg['Subject'] = subject
 
-        # Create HTML table for form data
-        table_rows = ""
-        for key, value in form_data.items():
-            # Format key to be more readable (capitalize and replace underscores)
-            formatted_key = key.replace("_", " ").title()
-            table_rows += f"""
-            <tr>
-                <td style="padding: 8px; border: 1px solid #ddd; background-color: #f9f9f9; font-weight: bold;">{formatted_key}</td>
-                <td style="padding: 8px; border: 1px solid #ddd;">{value}</td>
-            </tr>"""
-
-        html_body = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <h2 style="color: #2c3e50;">Hello Akash,</h2>
-
-            <p>You have received a new enquiry from your website.</p>
-
-            <h3 style="color: #34495e;">Form Details:</h3>
-
-            <table style="border-collapse: collapse; width: 100%; max-width: 600px; margin: 20px 0;">
-                <thead>
-                    <tr style="background-color: #3498db; color: white;">
-                        <th style="padding: 12px; border: 1px solid #ddd; text-align: left;">Field</th>
-                        <th style="padding: 12px; border: 1px solid #ddd; text-align: left;">Value</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {table_rows}
-                </tbody>
-            </table>
-
-            <p style="margin-top: 30px; padding: 15px; background-color: #ecf0f1; border-left: 4px solid #3498db;">
-                <strong>Submitted at:</strong> {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-            </p>
-
-            <hr style="margin: 30px 0; border: none; border-top: 1px solid #bdc3c7;">
-
-            <p style="font-size: 12px; color: #7f8c8d;">
-                This email was automatically generated from your website contact form.
-            </p>
-        </body>
-        </html>
-        """
+        html_body = render_email_html("Hello Akash,", form_data)
 
         msg.attach(MIMEText(html_body, 'html'))
 
-        server = smtplib.SMTP(EMAIL_CONFIG_AKASH["smtp_server"], EMAIL_CONFIG_AKASH["smtp_port"])
-        server.starttls()
-
         if EMAIL_CONFIG_AKASH["password"]:
-            server.login(EMAIL_CONFIG_AKASH["email"], EMAIL_CONFIG_AKASH["password"])
-            server.send_message(msg)
-            server.quit()
+            await send_smtp_message(EMAIL_CONFIG_AKASH, msg)
             return True
         else:
             logger.warning("Email password not configured")
             return False
 
     except Exception as e:
-        logger.error(f"Error sending email: {e}")
+        logger.error("Error sending email: %s", e)
         return False
 
 
+def get_google_credentials():
+    """Load the service-account credentials used by the Google Sheets client manager"""
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_file(GOOGLE_SERVICE_ACCOUNT_PATH)
+    return creds.with_scopes(GOOGLE_SHEETS_SCOPES)
+
+
+# Created once so the authorized client (and its OAuth token) is reused across submissions
+_gspread_client_manager = None
+
+
+def get_gspread_client_manager():
+    """Return the shared Google Sheets client manager, creating it on first use"""
+    global _gspread_client_manager
+    if _gspread_client_manager is None:
+        import gspread_asyncio
+
+        _gspread_client_manager = gspread_asyncio.AsyncioGspreadClientManager(get_google_credentials)
+    return _gspread_client_manager
+
+
 async def add_to_google_sheet(form_data: dict):
     """Add dynamic form data to Google Sheet"""
     try:
-        service_account_path = "GOOGLE_SERVICE_ACCOUNT_JSON"
-
-        if not service_account_path or not os.path.exists(service_account_path):
-            logger.info("Google Sheets credentials not configured - logging form data instead")
-            logger.info(f"Form data to add to sheet: {form_data}")
+        if not GOOGLE_SHEETS_CONFIGURED:
+            logger.info("Google Sheets credentials not configured - skipping sheet update")
             return False
 
-        gc = gspread.service_account(filename=service_account_path)
-        sheet = gc.open_by_key(GOOGLE_SHEET_ID).sheet1
-
-        # Get all existing records to check if headers exist
-        existing_records = sheet.get_all_records()
+        agc = await get_gspread_client_manager().authorize()
+        spreadsheet = await agc.open_by_key(GOOGLE_SHEET_ID)
+        sheet = await spreadsheet.get_worksheet(0)
 
-        # Get current headers or create new ones
-        if len(existing_records) == 0:
-            # No data exists, create headers from form_data keys
-            headers = list(form_data.keys())
-            sheet.insert_row(headers, 1)
-        else:
-            # Get existing headers
-            headers = sheet.row_values(1)
+        # Only the header row is needed - an empty list means the sheet has no headers yet
+        headers = await sheet.row_values(1)
 
-            # Check if we need to add new columns
-            new_fields = [key for key in form_data.keys() if key not in headers]
-            if new_fields:
-                # Add new headers
-                headers.extend(new_fields)
-                sheet.insert_row(headers, 1)
-                sheet.delete_rows(2)  # Remove old header row
+        # Check if we need to add new columns
+        new_fields = [key for key in form_data.keys() if key not in headers]
+        if new_fields:
+            # Rewrite the header row in place (also creates it on an empty sheet)
+            headers.extend(new_fields)
+            await sheet.update(range_name="1:1", values=[headers])
 
         # Create row data based on current headers
         row_data = []
         for header in headers:
             row_data.append(form_data.get(header, ""))
 
-        sheet.append_row(row_data)
-        logger.info(f"Successfully added form data to Google Sheet with {len(headers)} fields")
+        await sheet.append_row(row_data)
+        logger.info("Successfully added form data to Google Sheet with %s fields", len(headers))
         return True
 
     except Exception as e:
-        logger.error(f"Error adding to Google Sheet: {e}")
-        logger.info(f"Form data (Google Sheets failed): {form_data}")
+        logger.error("Error adding to Google Sheet: %s", e)
+        # Log only the field names - the values are personal details
+        logger.info("Form fields not added to Google Sheet: %s", list(form_data))
         return False
 
 
@@ -513,58 +755,198 @@ def root():
     }
 
 
-@app.get("/market-summary")
-def market_summary():
-    """Get market summary with Indian indices, top gainers/losers and news"""
+@app.on_event("startup")
+async def configure_executor():
+    """Enlarge the default threadpool used to run the blocking market-data fetches"""
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=16))
+
+
+# Like the HTTP client, the Redis connection pool is bound to the loop it was created on
+_redis_client = None
+_redis_client_loop = None
+
+
+def get_redis_client():
+    """Return the Redis client for the running event loop, or None when REDIS_URL is not configured"""
+    global _redis_client, _redis_client_loop
+    if not REDIS_URL:
+        return None
+
+    loop = asyncio.get_running_loop()
+    if _redis_client is None or _redis_client_loop is not loop:
+        import redis.asyncio as redis
+
+        _redis_client = redis.from_url(REDIS_URL)
+        _redis_client_loop = loop
+    return _redis_client
+
+
+def _has_movers(value) -> bool:
+    """True when a fetch_top_movers result has at least one gainer or loser"""
+    return any(value)
+
+
+def _has_index_data(value) -> bool:
+    """True when at least one index in a fetch_indian_indices result was fetched successfully"""
+    return any(entry.get("status") != "error" for entry in value.values())
+
+
+async def cached(key: str, ttl: int, coro_fn, should_cache=bool):
+    """Return coro_fn()'s result, memoized in Redis for ttl seconds across all workers
+
+    Fetchers swallow their errors and return placeholder results, so should_cache decides
+    whether a result is real data worth sharing with the other workers.
+    """
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return await coro_fn()
+
     try:
-        # Fetch Indian market indices
-        indian_indices = fetch_indian_indices()
+        cached_value = await redis_client.get(key)
+        if cached_value is not None:
+            return orjson.loads(cached_value)
+    except Exception as e:
+        # Redis is only an optimisation - fall through to a live fetch
+        logger.warning("Redis get failed for %s: %s", key, e)
 
-        # Fetch top gainers/losers
-        top5_gainers_global = fetch_top_stocks(region_filter=None, gainers=True)
-        top5_losers_global = fetch_top_stocks(region_filter=None, gainers=False)
-        top5_gainers_india = fetch_top_stocks(region_filter="in", gainers=True)
-        top5_losers_india = fetch_top_stocks(region_filter="in", gainers=False)
+    value = await coro_fn()
 
-        # Fetch news
-        global_news = fetch_global_news()
-        indian_news = fetch_indian_news(indian_symbols)
+    if should_cache(value):
+        try:
+            await redis_client.set(key, orjson.dumps(value), ex=ttl)
+        except Exception as e:
+            logger.warning("Redis set failed for %s: %s", key, e)
+    return value
+
+
+async def build_market_summary():
+    """Fetch every market-summary section concurrently and assemble the response"""
+    # Blocking yfinance fetches run on worker threads; the screener calls stay on the event
+    # loop as native async, including JSON decoding and flattening of their 5-row responses
+    (
+        indian_indices,
+        (top5_gainers_global, top5_losers_global),
+        (top5_gainers_india, top5_losers_india),
+        global_news,
+        indian_news,
+    ) = await asyncio.gather(
+        cached(
+            "market:indices",
+            FETCH_CACHE_TTL,
+            lambda: asyncio.to_thread(fetch_indian_indices),
+            should_cache=_has_index_data,
+        ),
+        cached("market:movers:global", FETCH_CACHE_TTL, lambda: fetch_top_movers(None), should_cache=_has_movers),
+        cached("market:movers:in", FETCH_CACHE_TTL, lambda: fetch_top_movers("in"), should_cache=_has_movers),
+        cached("market:news:global", FETCH_CACHE_TTL, lambda: asyncio.to_thread(fetch_global_news)),
+        cached(
+            "market:news:" + ",".join(indian_symbols),
+            FETCH_CACHE_TTL,
+            lambda: asyncio.to_thread(fetch_indian_news, indian_symbols),
+        ),
+    )
 
-        return {
-            "success": True,
-            "data": {
-                "indian_indices": {
-                    "nifty": indian_indices.get("nifty", {}),
-                    "sensex": indian_indices.get("sensex", {}),
-                    "banknifty": indian_indices.get("banknifty", {}),
-                    "midcap_nifty": indian_indices.get("midcap_nifty", {})
-                },
-                "top5_gainers_global": top5_gainers_global,
-                "top5_losers_global": top5_losers_global,
-                "top5_gainers_india": top5_gainers_india,
-                "top5_losers_india": top5_losers_india,
-                "global_news": global_news,
-                "india_news": indian_news,
+    return {
+        "success": True,
+        "data": {
+            "indian_indices": {
+                "nifty": indian_indices.get("nifty", {}),
+                "sensex": indian_indices.get("sensex", {}),
+                "banknifty": indian_indices.get("banknifty", {}),
+                "midcap_nifty": indian_indices.get("midcap_nifty", {})
             },
-            "timestamp": datetime.now().isoformat()
-        }
+            "top5_gainers_global": top5_gainers_global,
+            "top5_losers_global": top5_losers_global,
+            "top5_gainers_india": top5_gainers_india,
+            "top5_losers_india": top5_losers_india,
+            "global_news": global_news,
+            "india_news": indian_news,
+        },
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+# In-process response cache: {key: (expires_at, payload)}
+_response_cache: Dict[str, tuple] = {}
+_response_cache_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _has_market_data(payload) -> bool:
+    """True when a market-summary payload has at least one fetched index, mover or article"""
+    data = payload["data"]
+    if any(entry and entry.get("status") != "error" for entry in data["indian_indices"].values()):
+        return True
+    return any(section for name, section in data.items() if name != "indian_indices")
+
+
+async def get_cached_response(key: str, ttl: float, builder, should_cache=bool):
+    """Return the cached payload for key, rebuilding it with builder() once it expires
+
+    The fetchers swallow their errors, so should_cache decides whether a freshly built
+    payload has real data; anything else is returned but rebuilt on the next request.
+    """
+    cached = _response_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    # Only one request rebuilds a given key; the rest wait and reuse its result
+    lock = _response_cache_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        cached = _response_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        payload = await builder()
+        if should_cache(payload):
+            _response_cache[key] = (time.monotonic() + ttl, payload)
+        return payload
+
+
+@app.get("/market-summary")
+async def market_summary():
+    """Get market summary with Indian indices, top gainers/losers and news"""
+    try:
+        return await get_cached_response(
+            "market-summary",
+            MARKET_SUMMARY_CACHE_TTL,
+            build_market_summary,
+            should_cache=_has_market_data,
+        )
 
     except Exception as e:
-        logger.error(f"Error in market summary: {e}")
+        logger.error("Error in market summary: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch market data: {str(e)}")
 
 
+async def read_form_data(request: Request) -> dict:
+    """Parse a submission into a dict in one pass - JSON bodies via orjson, anything else as a form"""
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            payload = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+
+        if not isinstance(payload, dict):
+            raise HTTPException(status_code=400, detail="JSON body must be an object of form fields")
+
+        # Values end up in the email table and as sheet cells, so only flat values are accepted
+        if any(value is not None and not isinstance(value, (str, int, float, bool)) for value in payload.values()):
+            raise HTTPException(status_code=400, detail="Form field values must be strings, numbers, booleans or null")
+
+        items = payload.items()
+    else:
+        items = (await request.form()).items()
+
+    # Blank fields show up as "Not provided" in the enquiry email (0 and false are real answers)
+    return {key: "Not provided" if value is None or value == "" else value for key, value in items}
+
+
 @app.post("/submit-form")
 async def submit_form(request: Request):
     """Submit dynamic form data - accepts any fields, sends email and adds to Google Sheet"""
     try:
         # Get form data from request
-        form = await request.form()
-
-        # Convert form data to dictionary
-        form_data = {}
-        for key, value in form.items():
-            form_data[key] = value if value else "Not provided"
+        form_data = await read_form_data(request)
 
         # Add timestamp
         form_data["timestamp"] = datetime.now().isoformat()
@@ -572,24 +954,31 @@ async def submit_form(request: Request):
         # Get subject for email (default if not provided)
         subject = form_data.get("subject", "Aadhar Capital Website Enquiry")
 
-        email_sent = await send_email(
+        email_task = send_email(
             subject=f"{subject}",
             form_data=form_data
         )
 
-        # sheet_added = await add_to_google_sheet(form_data)
+        if GOOGLE_SHEETS_CONFIGURED:
+            # Email and sheet write are independent, so run them side by side
+            email_sent, sheet_added = await asyncio.gather(email_task, add_to_google_sheet(form_data))
+        else:
+            email_sent = await email_task
+            sheet_added = False
 
         return {
             "success": True,
             "message": "Form submitted successfully",
             "email_sent": email_sent,
-            # "sheet_updated": sheet_added,
+            "sheet_updated": sheet_added,
             "timestamp": datetime.now().isoformat(),
             "data": form_data
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error submitting form: {e}")
+        logger.error("Error submitting form: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to submit form: {str(e)}")
 
 
@@ -598,12 +987,7 @@ async def submit_form_akash(request: Request):
     """Submit dynamic form data - accepts any fields, sends email and adds to Google Sheet"""
     try:
         # Get form data from request
-        form = await request.form()
-
-        # Convert form data to dictionary
-        form_data = {}
-        for key, value in form.items():
-            form_data[key] = value if value else "Not provided"
+        form_data = await read_form_data(request)
 
         # Add timestamp
         form_data["timestamp"] = datetime.now().isoformat()
@@ -627,11 +1011,45 @@ async def submit_form_akash(request: Request):
             "data": form_data
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error submitting form: {e}")
+        logger.error("Error submitting form: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to submit form: {str(e)}")
 
 
+@app.on_event("shutdown")
+async def close_smtp_clients():
+    """Close any persistent SMTP connections cleanly"""
+    for account, client in list(_smtp_clients.items()):
+        try:
+            if client.is_connected:
+                await client.quit()
+        except Exception:
+            pass
+        _drop_smtp_client(account)
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close the shared HTTP client's pooled connections"""
+    global _http_client, _http_client_loop
+    if _http_client is not None and _http_client_loop is asyncio.get_running_loop():
+        await _http_client.aclose()
+    _http_client = None
+    _http_client_loop = None
+
+
+@app.on_event("shutdown")
+async def close_redis_client():
+    """Close the shared Redis connection pool"""
+    global _redis_client, _redis_client_loop
+    if _redis_client is not None and _redis_client_loop is asyncio.get_running_loop():
+        await _redis_client.aclose()
+    _redis_client = None
+    _redis_client_loop = None
+
+
 @app.get("/health")
 def health_check():
     return {
@@ -648,4 +1066,4 @@ app = app
 # For local development
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools", reload=True)